@@ -2693,6 +2693,17 @@ WHISPER_VAD_FILTER = PersistentConfig(
 
 WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "").lower() or None
 
+# Batch size for faster-whisper's BatchedInferencePipeline; 0 transcribes sequentially
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "0"))
+
+# Greedy decoding suits short voice input; raise for long-form recordings
+WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "1"))
+
+# CTranslate2 threads for CPU inference; defaults to an estimate of physical cores
+WHISPER_CPU_THREADS = int(
+    os.getenv("WHISPER_CPU_THREADS", str(max(1, (os.cpu_count() or 2) // 2)))
+)
+
 # Add Deepgram configuration
 DEEPGRAM_API_KEY = PersistentConfig(
     "DEEPGRAM_API_KEY",
@@ -557,3 +557,14 @@ PIP_PACKAGE_INDEX_OPTIONS = os.getenv("PIP_PACKAGE_INDEX_OPTIONS", "").split()
 ####################################
 
 EXTERNAL_PWA_MANIFEST_URL = os.environ.get("EXTERNAL_PWA_MANIFEST_URL")
+
+
+####################################
+# JARVIS MEMORY
+####################################
+
+MEMORY_SEARCH_CACHE_SIMILARITY = float(
+    os.environ.get("MEMORY_SEARCH_CACHE_SIMILARITY", "0.95")
+)
+MEMORY_SEARCH_CACHE_SIZE = int(os.environ.get("MEMORY_SEARCH_CACHE_SIZE", "2048"))
+MEMORY_SEARCH_CACHE_TTL = int(os.environ.get("MEMORY_SEARCH_CACHE_TTL", "300"))
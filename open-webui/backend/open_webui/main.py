@@ -1009,6 +1009,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor-paginated endpoints return the next page's cursor in a header
+    expose_headers=["X-Next-Cursor"],
 )
 
 
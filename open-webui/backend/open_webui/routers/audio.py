@@ -35,6 +35,9 @@ from open_webui.config import (
     WHISPER_MODEL_DIR,
     CACHE_DIR,
     WHISPER_LANGUAGE,
+    WHISPER_BATCH_SIZE,
+    WHISPER_BEAM_SIZE,
+    WHISPER_CPU_THREADS,
 )
 
 from open_webui.constants import ERROR_MESSAGES
@@ -124,13 +127,19 @@ def set_faster_whisper_model(model: str, auto_update: bool = False):
     if model:
         from faster_whisper import WhisperModel
 
+        device = DEVICE_TYPE if DEVICE_TYPE and DEVICE_TYPE == "cuda" else "cpu"
         faster_whisper_kwargs = {
             "model_size_or_path": model,
-            "device": DEVICE_TYPE if DEVICE_TYPE and DEVICE_TYPE == "cuda" else "cpu",
-            "compute_type": "int8",
+            "device": device,
+            "compute_type": "float16" if device == "cuda" else "int8",
+            "cpu_threads": WHISPER_CPU_THREADS,
+            "num_workers": 1,
             "download_root": WHISPER_MODEL_DIR,
             "local_files_only": not auto_update,
         }
+        log.info(
+            f"Loading WhisperModel on {device} with compute_type={faster_whisper_kwargs['compute_type']}, cpu_threads={WHISPER_CPU_THREADS}"
+        )
 
         try:
             whisper_model = WhisperModel(**faster_whisper_kwargs)
@@ -539,12 +548,28 @@ def transcription_handler(request, file_path):
             )
 
         model = request.app.state.faster_whisper_model
-        segments, info = model.transcribe(
-            file_path,
-            beam_size=5,
-            vad_filter=request.app.state.config.WHISPER_VAD_FILTER,
-            language=WHISPER_LANGUAGE,
-        )
+        if WHISPER_BATCH_SIZE > 1:
+            from faster_whisper import BatchedInferencePipeline
+
+            # Batched decoding splits the audio on VAD speech chunks
+            segments, info = BatchedInferencePipeline(model=model).transcribe(
+                file_path,
+                batch_size=WHISPER_BATCH_SIZE,
+                beam_size=WHISPER_BEAM_SIZE,
+                temperature=0.0,
+                condition_on_previous_text=False,
+                vad_filter=True,
+                language=WHISPER_LANGUAGE,
+            )
+        else:
+            segments, info = model.transcribe(
+                file_path,
+                beam_size=WHISPER_BEAM_SIZE,
+                temperature=0.0,
+                condition_on_previous_text=False,
+                vad_filter=request.app.state.config.WHISPER_VAD_FILTER,
+                language=WHISPER_LANGUAGE,
+            )
         log.info(
             "Detected language '%s' with probability %f"
             % (info.language, info.language_probability)
@@ -780,6 +805,11 @@ def transcription_handler(request, file_path):
 def transcribe(request: Request, file_path):
     log.info(f"transcribe: {file_path}")
 
+    # Local faster-whisper decodes the original file itself and has no upload
+    # size limit, so skip the MP3 conversion, compression and splitting below
+    if request.app.state.config.STT_ENGINE == "":
+        return {"text": transcription_handler(request, file_path)["text"]}
+
     if is_audio_conversion_required(file_path):
         file_path = convert_audio_to_mp3(file_path)
 
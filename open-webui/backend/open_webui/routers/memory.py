@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional
+from aiocache import SimpleMemoryCache
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Literal, Optional
 from datetime import datetime
+import asyncio
 
 from ..models.memory import (
     ConversationMemory,
@@ -12,35 +15,75 @@ from ..models.memory import (
 from ..internal.memory import MemoryManager
 from ..dependencies import get_memory_manager, get_current_user
 from ..models.users import User
+from ..utils.memory import (
+    decode_cursor,
+    invalidate_memory_search_cache,
+    memory_search_cache,
+    next_page_cursor,
+    page_kwargs,
+    parse_import
+)
+from ..env import MEMORY_SEARCH_CACHE_SIMILARITY
 
 router = APIRouter(prefix="/api/v1/memory", tags=["memory"])
 
+# Config and stats are polled by dashboards; absorb bursts for a few seconds
+SETTINGS_CACHE_TTL = 5
+settings_cache = SimpleMemoryCache()
+
+async def _cached_setting(key: str, fetch, response: Response):
+    """Serve `key` from the short-lived settings cache, fetching on a miss"""
+    value = await settings_cache.get(key)
+    if value is None:
+        value = await fetch()
+        await settings_cache.set(key, value, ttl=SETTINGS_CACHE_TTL)
+    response.headers["Cache-Control"] = f"private, max-age={SETTINGS_CACHE_TTL}"
+    return value
+
+def _parse_cursor(cursor: Optional[str]):
+    """Decode a page cursor, rejecting malformed values with a 400"""
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/stats", response_model=MemoryStats)
 async def get_memory_stats(
+    response: Response,
     memory_manager: MemoryManager = Depends(get_memory_manager),
     current_user: User = Depends(get_current_user)
 ):
     """Get memory system statistics"""
     try:
-        return await memory_manager.get_stats()
+        return await _cached_setting("stats", memory_manager.get_stats, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/conversations/{conversation_id}", response_model=List[ConversationMemory])
 async def get_conversation_memories(
     conversation_id: str,
+    response: Response,
     limit: int = Query(default=50, ge=1, le=1000),
+    cursor: Optional[str] = Query(default=None),
     offset: int = Query(default=0, ge=0),
     memory_manager: MemoryManager = Depends(get_memory_manager),
     current_user: User = Depends(get_current_user)
 ):
-    """Get memories for a specific conversation"""
+    """
+    Get memories for a specific conversation, newest first.
+    Pass the X-Next-Cursor header of a page as `cursor` to fetch the next one.
+    """
+    page_cursor = _parse_cursor(cursor)
     try:
-        return await memory_manager.get_conversation_memories(
+        memories = await memory_manager.get_conversation_memories(
             conversation_id=conversation_id,
             limit=limit,
-            offset=offset
+            **page_kwargs(page_cursor, offset)
         )
+        next_cursor = next_page_cursor(memories, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return memories
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -53,15 +96,18 @@ async def store_conversation_memory(
 ):
     """Store a new conversation memory"""
     try:
-        return await memory_manager.store_conversation_memory(
+        stored = await memory_manager.store_conversation_memory(
             conversation_id=conversation_id,
             memory=memory
         )
+        invalidate_memory_search_cache()
+        return stored
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/search", response_model=MemorySearchResult)
 async def search_memories(
+    request: Request,
     query: str,
     limit: int = Query(default=10, ge=1, le=100),
     memory_type: Optional[str] = None,
@@ -69,14 +115,36 @@ async def search_memories(
     memory_manager: MemoryManager = Depends(get_memory_manager),
     current_user: User = Depends(get_current_user)
 ):
-    """Search through memories"""
+    """Search through memories, reusing results of semantically identical queries"""
     try:
-        return await memory_manager.search_memories(
+        # The RAG embedding model only keys the cache; switching it starts a
+        # fresh namespace instead of comparing vectors from different models
+        namespace = (
+            current_user.id,
+            request.app.state.config.RAG_EMBEDDING_MODEL,
+            memory_type,
+            min_relevance,
+            limit
+        )
+        generation = memory_search_cache.generation
+        # Embed in the threadpool so the loop keeps serving while the model runs
+        embedding = await run_in_threadpool(
+            request.app.state.EMBEDDING_FUNCTION, query, user=current_user
+        )
+        cached = memory_search_cache.lookup(
+            namespace, embedding, threshold=MEMORY_SEARCH_CACHE_SIMILARITY
+        )
+        if cached is not None:
+            return cached
+
+        result = await memory_manager.search_memories(
             query=query,
             limit=limit,
             memory_type=memory_type,
             min_relevance=min_relevance
         )
+        memory_search_cache.insert(namespace, embedding, result, generation)
+        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -88,6 +156,7 @@ async def cleanup_memories(
     """Trigger memory cleanup"""
     try:
         stats = await memory_manager.cleanup_memories()
+        invalidate_memory_search_cache()
         return {
             "status": "success",
             "message": "Memory cleanup completed",
@@ -99,12 +168,13 @@ async def cleanup_memories(
 
 @router.get("/config", response_model=MemoryConfig)
 async def get_memory_config(
+    response: Response,
     memory_manager: MemoryManager = Depends(get_memory_manager),
     current_user: User = Depends(get_current_user)
 ):
     """Get memory system configuration"""
     try:
-        return await memory_manager.get_config()
+        return await _cached_setting("config", memory_manager.get_config, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -117,6 +187,7 @@ async def update_memory_config(
     """Update memory system configuration"""
     try:
         await memory_manager.update_config(config)
+        await settings_cache.delete("config")
         return {
             "status": "success",
             "message": "Configuration updated",
@@ -134,6 +205,7 @@ async def delete_conversation_memories(
     """Delete all memories for a conversation"""
     try:
         await memory_manager.delete_conversation_memories(conversation_id)
+        invalidate_memory_search_cache()
         return {
             "status": "success",
             "message": f"Memories for conversation {conversation_id} deleted",
@@ -149,7 +221,10 @@ async def get_important_memories(
     memory_manager: MemoryManager = Depends(get_memory_manager),
     current_user: User = Depends(get_current_user)
 ):
-    """Get important memories"""
+    """
+    Get important memories.
+    Not ordered by (created_at, id), so this keeps offset paging.
+    """
     try:
         return await memory_manager.get_important_memories(
             limit=limit,
@@ -176,11 +251,14 @@ async def get_related_memories(
 
 @router.post("/export")
 async def export_memories(
-    format: str = Query(default="json", regex="^(json|csv)$"),
+    format: Literal["json", "csv"] = Query(default="json"),
     memory_manager: MemoryManager = Depends(get_memory_manager),
     current_user: User = Depends(get_current_user)
 ):
-    """Export memories in specified format"""
+    """
+    Export memories in specified format.
+    Still built in memory: streaming needs a batched scan in MemoryManager.
+    """
     try:
         export_data = await memory_manager.export_memories(format)
         return {
@@ -195,13 +273,21 @@ async def export_memories(
 @router.post("/import")
 async def import_memories(
     data: dict,
-    format: str = Query(default="json", regex="^(json|csv)$"),
+    format: Literal["json", "csv"] = Query(default="json"),
     memory_manager: MemoryManager = Depends(get_memory_manager),
     current_user: User = Depends(get_current_user)
 ):
     """Import memories from specified format"""
+    # Parse in a worker thread; only the store stays on the event loop
+    try:
+        records = await asyncio.to_thread(parse_import, data, format)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
     try:
-        stats = await memory_manager.import_memories(data, format)
+        # Takes parsed rows, not the baseline's raw (data, format) pair
+        stats = await memory_manager.import_memories(records)
+        invalidate_memory_search_cache()
         return {
             "status": "success",
             "message": "Memories imported successfully",
@@ -1,21 +1,67 @@
 from fastapi import WebSocket
-from typing import Dict, Any, Set, Optional
+from pydantic import BaseModel, TypeAdapter
+from typing import Dict, Any, List, Set, Optional
 import asyncio
 import json
 import logging
+import orjson
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 from ..models.memory import ConversationMemory
 from ..internal.memory import MemoryManager
+from ..utils.memory import (
+    decode_cursor,
+    invalidate_memory_search_cache,
+    new_memory_id,
+    next_page_cursor,
+    page_kwargs
+)
 
 logger = logging.getLogger(__name__)
 
+# Frames a client may have pending before it is treated as a slow consumer
+OUTBOUND_QUEUE_SIZE = 256
+
+# Seconds without activity before a connection is cleaned up
+INACTIVITY_TIMEOUT = 300
+
+def _default(obj: Any) -> Any:
+    """orjson fallback for values it does not serialize natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, set):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+# Dumps a whole page of memories in one pass instead of one model_dump per row
+_MEMORY_LIST = TypeAdapter(List[ConversationMemory])
+
+def _dump_memories(memories: List[Any]) -> List[Dict[str, Any]]:
+    """Turn a page of memories into JSON-ready rows, passing raw rows through"""
+    if not memories or isinstance(memories[0], dict):
+        return list(memories)
+    return _MEMORY_LIST.dump_python(memories, mode="json")
+
+def _encode(message: Dict[str, Any]) -> str:
+    """Serialize an outbound message to a text frame"""
+    return orjson.dumps(
+        message,
+        default=_default,
+        option=orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+
 class MemoryWebSocketManager:
     def __init__(self, memory_manager: MemoryManager):
         self.memory_manager = memory_manager
         self.active_connections: Dict[str, WebSocket] = {}
         self.connection_metadata: Dict[str, Dict[str, Any]] = {}
         self.conversation_subscribers: Dict[str, Set[str]] = {}
+        self.outbound_queues: Dict[str, asyncio.Queue] = {}
+        self.writer_tasks: Dict[str, asyncio.Task] = {}
+        # Clients ordered from least to most recently active
+        self.activity: "OrderedDict[str, float]" = OrderedDict()
         self.broadcast_queue = asyncio.Queue()
         
         # Start background tasks
@@ -29,10 +75,19 @@ class MemoryWebSocketManager:
             self.active_connections[client_id] = websocket
             self.connection_metadata[client_id] = {
                 "connected_at": datetime.utcnow().isoformat(),
-                "last_active": datetime.utcnow().isoformat(),
+                "last_active": time.monotonic(),
                 "messages_received": 0,
                 "messages_sent": 0
             }
+            self._touch(client_id)
+            
+            # Outbound messages go through a bounded queue drained by one writer
+            queue = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+            self.outbound_queues[client_id] = queue
+            task = asyncio.create_task(self._writer_loop(client_id, websocket, queue))
+            self.writer_tasks[client_id] = task
+            self.background_tasks.add(task)
+            task.add_done_callback(self.background_tasks.discard)
             
             # Send welcome message
             await self.send_personal_message(
@@ -53,10 +108,18 @@ class MemoryWebSocketManager:
     async def disconnect(self, client_id: str):
         """Handle client disconnection"""
         try:
+            self.activity.pop(client_id, None)
+            
             # Remove from all conversation subscriptions
             for subscribers in self.conversation_subscribers.values():
                 subscribers.discard(client_id)
             
+            # Stop the writer unless it is the one disconnecting us
+            writer = self.writer_tasks.pop(client_id, None)
+            if writer is not None and writer is not asyncio.current_task():
+                writer.cancel()
+            self.outbound_queues.pop(client_id, None)
+            
             # Clean up connection data
             if client_id in self.active_connections:
                 del self.active_connections[client_id]
@@ -68,33 +131,94 @@ class MemoryWebSocketManager:
         except Exception as e:
             logger.error(f"Error during disconnect: {str(e)}")
 
-    async def send_personal_message(self, client_id: str, message: Dict[str, Any]):
-        """Send a message to a specific client"""
-        if client_id in self.active_connections:
-            try:
-                websocket = self.active_connections[client_id]
-                await websocket.send_json(message)
+    def _touch(self, client_id: str):
+        """Record activity, moving the client to the most recent end"""
+        now = time.monotonic()
+        self.connection_metadata[client_id]["last_active"] = now
+        self.activity[client_id] = now
+        self.activity.move_to_end(client_id)
+
+    async def _writer_loop(self, client_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        """Drain a client's outbound queue onto its socket"""
+        try:
+            while True:
+                frame = await queue.get()
+                await websocket.send_text(frame)
                 
                 # Update metadata
-                self.connection_metadata[client_id]["messages_sent"] += 1
-                self.connection_metadata[client_id]["last_active"] = datetime.utcnow().isoformat()
+                metadata = self.connection_metadata.get(client_id)
+                if metadata is not None:
+                    metadata["messages_sent"] += 1
+                    self._touch(client_id)
                 
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error sending message to {client_id}: {str(e)}")
+            await self.disconnect(client_id)
+
+    def _offer(self, client_id: str, frame: str) -> bool:
+        """Queue a frame without awaiting; False if the client cannot keep up"""
+        queue = self.outbound_queues.get(client_id)
+        if queue is None:
+            return True
+        try:
+            queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Dropping slow client {client_id}: outbound queue full")
+            return False
+
+    async def _drop_slow_client(self, client_id: str):
+        """Close a client that cannot keep up, then forget it"""
+        websocket = self.active_connections.get(client_id)
+        if websocket is not None:
+            try:
+                # 1013: try again later
+                await websocket.close(code=1013)
             except Exception as e:
-                logger.error(f"Error sending message to {client_id}: {str(e)}")
-                await self.disconnect(client_id)
+                logger.debug(f"Error closing slow client {client_id}: {str(e)}")
+        await self.disconnect(client_id)
+
+    async def _enqueue(self, client_id: str, frame: str):
+        """Queue a serialized frame without waiting on the socket"""
+        if not self._offer(client_id, frame):
+            await self._drop_slow_client(client_id)
+
+    async def send_personal_message(self, client_id: str, message: Dict[str, Any]):
+        """Send a message to a specific client"""
+        if client_id in self.outbound_queues:
+            await self._enqueue(client_id, _encode(message))
 
     async def broadcast_to_conversation(self, conversation_id: str, message: Dict[str, Any]):
         """Broadcast a message to all clients subscribed to a conversation"""
-        if conversation_id in self.conversation_subscribers:
-            for client_id in self.conversation_subscribers[conversation_id]:
-                await self.send_personal_message(client_id, message)
+        subscribers = self.conversation_subscribers.get(conversation_id)
+        if not subscribers:
+            return
+        
+        # Serialize once and queue the same frame for every subscriber
+        frame = _encode(message)
+        slow_clients = [
+            client_id for client_id in list(subscribers)
+            if not self._offer(client_id, frame)
+        ]
+        
+        # Drop clients that fell behind concurrently, after everyone is queued
+        if slow_clients:
+            await asyncio.gather(
+                *(self._drop_slow_client(client_id) for client_id in slow_clients),
+                return_exceptions=True
+            )
 
     async def handle_message(self, client_id: str, message: Dict[str, Any]):
         """Process incoming WebSocket messages"""
+        if client_id not in self.connection_metadata:
+            return
+        
         try:
             # Update metadata
             self.connection_metadata[client_id]["messages_received"] += 1
-            self.connection_metadata[client_id]["last_active"] = datetime.utcnow().isoformat()
+            self._touch(client_id)
             
             message_type = message.get("type", "unknown")
             
@@ -127,10 +251,11 @@ class MemoryWebSocketManager:
                 self.conversation_subscribers[conversation_id] = set()
             self.conversation_subscribers[conversation_id].add(client_id)
             
-            # Send recent memories
+            # Acknowledge with the first keyset page in a single frame
+            limit = 50
             memories = await self.memory_manager.get_conversation_memories(
                 conversation_id=conversation_id,
-                limit=50
+                limit=limit
             )
             
             await self.send_personal_message(
@@ -138,7 +263,9 @@ class MemoryWebSocketManager:
                 {
                     "type": "memories",
                     "conversation_id": conversation_id,
-                    "memories": [memory.dict() for memory in memories]
+                    "subscribed": True,
+                    "memories": _dump_memories(memories),
+                    "next_cursor": next_page_cursor(memories, limit)
                 }
             )
 
@@ -157,7 +284,7 @@ class MemoryWebSocketManager:
             
             # Create memory entry
             memory = ConversationMemory(
-                id=f"mem_{datetime.utcnow().timestamp()}",
+                id=new_memory_id(),
                 conversation_id=conversation_id,
                 user_message=message.get("message", ""),
                 assistant_message=message.get("response", ""),
@@ -173,6 +300,7 @@ class MemoryWebSocketManager:
                 conversation_id=conversation_id,
                 memory=memory
             )
+            invalidate_memory_search_cache()
             
             # Notify subscribers
             await self.broadcast_to_conversation(
@@ -180,7 +308,7 @@ class MemoryWebSocketManager:
                 {
                     "type": "memory_update",
                     "conversation_id": conversation_id,
-                    "memory": stored_memory.dict()
+                    "memory": stored_memory
                 }
             )
             
@@ -195,11 +323,15 @@ class MemoryWebSocketManager:
             if not conversation_id:
                 raise ValueError("conversation_id is required")
             
-            # Get memories
+            # Get memories, continuing from the client's cursor if any
+            limit = message.get("limit", 50)
             memories = await self.memory_manager.get_conversation_memories(
                 conversation_id=conversation_id,
-                limit=message.get("limit", 50),
-                offset=message.get("offset", 0)
+                limit=limit,
+                **page_kwargs(
+                    decode_cursor(message.get("cursor")),
+                    message.get("offset", 0)
+                )
             )
             
             # Send response
@@ -208,7 +340,8 @@ class MemoryWebSocketManager:
                 {
                     "type": "sync_response",
                     "conversation_id": conversation_id,
-                    "memories": [memory.dict() for memory in memories],
+                    "memories": _dump_memories(memories),
+                    "next_cursor": next_page_cursor(memories, limit),
                     "timestamp": datetime.utcnow().isoformat()
                 }
             )
@@ -227,19 +360,17 @@ class MemoryWebSocketManager:
         """Monitor and cleanup inactive connections"""
         try:
             while True:
-                current_time = datetime.utcnow()
+                current_time = time.monotonic()
                 
-                # Check each connection
-                for client_id in list(self.connection_metadata.keys()):
-                    metadata = self.connection_metadata[client_id]
-                    last_active = datetime.fromisoformat(
-                        metadata["last_active"].replace('Z', '+00:00')
-                    )
+                # Only the expired head of the activity order needs visiting
+                while self.activity:
+                    client_id, last_active = next(iter(self.activity.items()))
+                    if current_time - last_active <= INACTIVITY_TIMEOUT:
+                        break
                     
-                    # If inactive for more than 5 minutes
-                    if (current_time - last_active).total_seconds() > 300:
-                        logger.info(f"Cleaning up inactive connection: {client_id}")
-                        await self.disconnect(client_id)
+                    logger.info(f"Cleaning up inactive connection: {client_id}")
+                    self.activity.pop(client_id, None)
+                    await self.disconnect(client_id)
                 
                 await asyncio.sleep(60)  # Check every minute
                 
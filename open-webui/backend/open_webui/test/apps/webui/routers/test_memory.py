@@ -0,0 +1,209 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+# The memory router needs the memory data layer (models.memory,
+# internal.memory, dependencies); skip where it is not installed
+memory_router = pytest.importorskip("open_webui.routers.memory")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from open_webui.dependencies import get_current_user, get_memory_manager
+from open_webui.utils.memory import encode_cursor, invalidate_memory_search_cache
+
+
+class FakeMemoryManager:
+    def __init__(self):
+        self.calls = []
+
+    async def get_conversation_memories(self, **kwargs):
+        self.calls.append(("get_conversation_memories", kwargs))
+        return []
+
+    async def search_memories(self, **kwargs):
+        self.calls.append(("search_memories", kwargs))
+        return {"memories": [{"id": "mem_1"}]}
+
+    async def get_config(self):
+        self.calls.append(("get_config", {}))
+        return {"enabled": True}
+
+    async def update_config(self, config):
+        self.calls.append(("update_config", config.model_dump()))
+
+    async def import_memories(self, records):
+        self.calls.append(("import_memories", records))
+        return {"imported": len(records)}
+
+
+def fake_embedding(query, user=None):
+    return [1.0, 0.0] if "tea" in query else [0.0, 1.0]
+
+
+@pytest.fixture
+def manager():
+    return FakeMemoryManager()
+
+
+@pytest.fixture
+def client(manager):
+    app = FastAPI()
+    app.include_router(memory_router.router)
+    app.dependency_overrides[get_memory_manager] = lambda: manager
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id="1")
+    app.state.config = SimpleNamespace(RAG_EMBEDDING_MODEL="model-a")
+    app.state.EMBEDDING_FUNCTION = fake_embedding
+    invalidate_memory_search_cache()
+    return TestClient(app)
+
+
+class TestConversationPagination:
+    BASE_PATH = "/api/v1/memory/conversations/chat-1"
+
+    def test_default_call_uses_offset(self, client, manager):
+        response = client.get(self.BASE_PATH)
+        assert response.status_code == 200
+        assert manager.calls == [
+            (
+                "get_conversation_memories",
+                {"conversation_id": "chat-1", "limit": 50, "offset": 0},
+            )
+        ]
+
+    def test_offset_is_forwarded(self, client, manager):
+        client.get(self.BASE_PATH, params={"limit": 10, "offset": 20})
+        assert manager.calls[0][1] == {
+            "conversation_id": "chat-1",
+            "limit": 10,
+            "offset": 20,
+        }
+
+    def test_cursor_is_forwarded(self, client, manager):
+        cursor = encode_cursor("2024-01-01T00:00:00", "mem_1")
+        client.get(self.BASE_PATH, params={"cursor": cursor})
+        assert manager.calls[0][1] == {
+            "conversation_id": "chat-1",
+            "limit": 50,
+            "cursor": ("2024-01-01T00:00:00", "mem_1"),
+        }
+
+    def test_invalid_cursor(self, client, manager):
+        response = client.get(self.BASE_PATH, params={"cursor": "bogus"})
+        assert response.status_code == 400
+        assert manager.calls == []
+
+
+class TestSearchCache:
+    BASE_PATH = "/api/v1/memory/search"
+
+    def searches(self, manager):
+        return [call for call in manager.calls if call[0] == "search_memories"]
+
+    def test_repeated_query_is_served_from_cache(self, client, manager):
+        first = client.get(self.BASE_PATH, params={"query": "tea"})
+        second = client.get(self.BASE_PATH, params={"query": "green tea"})
+        assert first.json() == second.json()
+        assert self.searches(manager) == [
+            (
+                "search_memories",
+                {
+                    "query": "tea",
+                    "limit": 10,
+                    "memory_type": None,
+                    "min_relevance": 0.5,
+                },
+            )
+        ]
+
+    def test_different_query_misses(self, client, manager):
+        client.get(self.BASE_PATH, params={"query": "tea"})
+        client.get(self.BASE_PATH, params={"query": "coffee"})
+        assert len(self.searches(manager)) == 2
+
+    def test_embedding_model_switch_misses(self, client, manager):
+        client.get(self.BASE_PATH, params={"query": "tea"})
+        client.app.state.config.RAG_EMBEDDING_MODEL = "model-b"
+        client.app.state.EMBEDDING_FUNCTION = lambda query, user=None: [1.0, 0.0, 0.0]
+        response = client.get(self.BASE_PATH, params={"query": "tea"})
+        assert response.status_code == 200
+        assert len(self.searches(manager)) == 2
+
+    def test_write_invalidates(self, client, manager):
+        client.get(self.BASE_PATH, params={"query": "tea"})
+        invalidate_memory_search_cache()
+        client.get(self.BASE_PATH, params={"query": "tea"})
+        assert len(self.searches(manager)) == 2
+
+
+class TestImport:
+    BASE_PATH = "/api/v1/memory/import"
+
+    def test_rows_are_parsed_before_the_store(self, client, manager):
+        response = client.post(
+            self.BASE_PATH, params={"format": "csv"}, json={"data": "id\nmem_1\n"}
+        )
+        assert response.status_code == 200
+        assert manager.calls == [("import_memories", [{"id": "mem_1"}])]
+
+    @pytest.mark.parametrize(
+        "format, body",
+        [
+            ("json", {"memories": [{"id": "mem_1"}]}),
+            ("csv", {"data": "id\n" + "x" * 200_000 + "\n"}),
+        ],
+    )
+    def test_malformed_payload_is_422(self, client, manager, format, body):
+        response = client.post(self.BASE_PATH, params={"format": format}, json=body)
+        assert response.status_code == 422
+        assert manager.calls == []
+
+
+class TestSettingsCache:
+    BASE_PATH = "/api/v1/memory/config"
+
+    @pytest.fixture(autouse=True)
+    def clear_settings_cache(self):
+        asyncio.run(memory_router.settings_cache.clear())
+
+    def config_reads(self, manager):
+        return [call for call in manager.calls if call[0] == "get_config"]
+
+    def test_config_is_served_from_cache(self, client, manager):
+        first = client.get(self.BASE_PATH)
+        second = client.get(self.BASE_PATH)
+        assert first.json() == second.json()
+        assert second.headers["Cache-Control"] == "private, max-age=5"
+        assert len(self.config_reads(manager)) == 1
+
+    def test_update_invalidates_config(self, client, manager):
+        config = client.get(self.BASE_PATH).json()
+        assert client.put(self.BASE_PATH, json=config).status_code == 200
+        client.get(self.BASE_PATH)
+        assert len(self.config_reads(manager)) == 2
+
+
+class TestFormat:
+    @pytest.mark.parametrize("path", ["/api/v1/memory/export", "/api/v1/memory/import"])
+    def test_unknown_format_is_422(self, client, manager, path):
+        response = client.post(path, params={"format": "xml"}, json={"data": []})
+        assert response.status_code == 422
+        assert manager.calls == []
+
+
+class TestSearchCacheRace:
+    BASE_PATH = "/api/v1/memory/search"
+
+    def test_result_racing_a_write_is_not_cached(self, client, manager):
+        search = manager.search_memories
+
+        async def search_during_write(**kwargs):
+            # A memory write lands while this search is still running
+            invalidate_memory_search_cache()
+            return await search(**kwargs)
+
+        manager.search_memories = search_during_write
+        client.get(self.BASE_PATH, params={"query": "tea"})
+        manager.search_memories = search
+        client.get(self.BASE_PATH, params={"query": "tea"})
+        assert len([call for call in manager.calls if call[0] == "search_memories"]) == 2
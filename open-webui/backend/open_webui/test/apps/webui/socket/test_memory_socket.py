@@ -0,0 +1,299 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+# The websocket manager needs the memory data layer (models.memory,
+# internal.memory); skip where it is not installed
+socket_memory = pytest.importorskip("open_webui.socket.memory")
+
+from open_webui.utils.memory import encode_cursor, memory_search_cache
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        self.frames.append(json.loads(frame))
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+class FakeMemoryManager:
+    def __init__(self):
+        self.calls = []
+
+    async def get_conversation_memories(self, **kwargs):
+        self.calls.append(kwargs)
+        return []
+
+    async def store_conversation_memory(self, conversation_id, memory):
+        return memory
+
+
+class StalledWebSocket(FakeWebSocket):
+    """A client that never finishes reading"""
+
+    async def send_text(self, frame):
+        await asyncio.Event().wait()
+
+
+def make_memory(memory_id, conversation_id="chat-1"):
+    return socket_memory.ConversationMemory(
+        id=memory_id,
+        conversation_id=conversation_id,
+        user_message="hello",
+        assistant_message="hi",
+        context={},
+        metadata={},
+    )
+
+
+async def flush():
+    """Let the writer tasks drain their queues"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def run(scenario):
+    """Run `scenario(manager, memory_manager)` against a fresh manager"""
+
+    async def main():
+        memory_manager = FakeMemoryManager()
+        manager = socket_memory.MemoryWebSocketManager(memory_manager)
+        try:
+            await scenario(manager, memory_manager)
+        finally:
+            await manager.cleanup()
+
+    asyncio.run(main())
+
+
+class TestPagination:
+    def test_subscribe_makes_the_plain_call(self):
+        async def scenario(manager, memory_manager):
+            websocket = FakeWebSocket()
+            await manager.connect(websocket, "client-1")
+            await manager.handle_message(
+                "client-1", {"type": "subscribe", "conversation_id": "chat-1"}
+            )
+            await flush()
+
+            assert memory_manager.calls == [{"conversation_id": "chat-1", "limit": 50}]
+            frame = websocket.frames[-1]
+            assert frame["type"] == "memories"
+            assert frame["subscribed"] is True
+            assert frame["next_cursor"] is None
+
+        run(scenario)
+
+    def test_sync_forwards_offset_without_cursor(self):
+        async def scenario(manager, memory_manager):
+            await manager.connect(FakeWebSocket(), "client-1")
+            await manager.handle_message(
+                "client-1", {"type": "sync", "conversation_id": "chat-1"}
+            )
+            await manager.handle_message(
+                "client-1",
+                {"type": "sync", "conversation_id": "chat-1", "offset": 20},
+            )
+
+            assert memory_manager.calls == [
+                {"conversation_id": "chat-1", "limit": 50, "offset": 0},
+                {"conversation_id": "chat-1", "limit": 50, "offset": 20},
+            ]
+
+        run(scenario)
+
+    def test_sync_forwards_cursor(self):
+        async def scenario(manager, memory_manager):
+            await manager.connect(FakeWebSocket(), "client-1")
+            await manager.handle_message(
+                "client-1",
+                {
+                    "type": "sync",
+                    "conversation_id": "chat-1",
+                    "cursor": encode_cursor("2024-01-01T00:00:00", "mem_1"),
+                },
+            )
+
+            assert memory_manager.calls == [
+                {
+                    "conversation_id": "chat-1",
+                    "limit": 50,
+                    "cursor": ("2024-01-01T00:00:00", "mem_1"),
+                }
+            ]
+
+        run(scenario)
+
+
+class TestSlowConsumer:
+    def test_full_queue_closes_the_socket(self, monkeypatch):
+        monkeypatch.setattr(socket_memory, "OUTBOUND_QUEUE_SIZE", 2)
+
+        async def scenario(manager, memory_manager):
+            websocket = StalledWebSocket()
+            await manager.connect(websocket, "client-1")
+            await flush()
+            # The writer holds the welcome frame; two more fill the queue
+            for i in range(3):
+                await manager.send_personal_message("client-1", {"n": i})
+
+            assert websocket.close_code == 1013
+            assert "client-1" not in manager.active_connections
+            assert "client-1" not in manager.outbound_queues
+
+            # Late frames from the dropped client are ignored, not errors
+            await manager.handle_message(
+                "client-1", {"type": "sync", "conversation_id": "chat-1"}
+            )
+            assert memory_manager.calls == []
+
+        run(scenario)
+
+
+async def subscribe(manager, client_id, conversation_id="chat-1"):
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, client_id)
+    await manager.handle_message(
+        client_id, {"type": "subscribe", "conversation_id": conversation_id}
+    )
+    await flush()
+    websocket.frames.clear()
+    return websocket
+
+
+class TestBroadcast:
+    def test_every_subscriber_gets_the_frame(self):
+        async def scenario(manager, memory_manager):
+            first = await subscribe(manager, "client-1")
+            second = await subscribe(manager, "client-2")
+            other = await subscribe(manager, "client-3", "chat-2")
+
+            await manager.broadcast_to_conversation(
+                "chat-1", {"type": "memory_update", "conversation_id": "chat-1"}
+            )
+            await flush()
+
+            expected = [{"type": "memory_update", "conversation_id": "chat-1"}]
+            assert first.frames == expected
+            assert second.frames == expected
+            assert other.frames == []
+
+        run(scenario)
+
+
+class TestActivityOrder:
+    def test_least_recently_active_client_comes_first(self):
+        async def scenario(manager, memory_manager):
+            await manager.connect(FakeWebSocket(), "client-1")
+            await manager.connect(FakeWebSocket(), "client-2")
+            await flush()
+            await manager.handle_message("client-1", {"type": "unsubscribe"})
+            assert list(manager.activity) == ["client-2", "client-1"]
+
+            await manager.disconnect("client-2")
+            assert list(manager.activity) == ["client-1"]
+
+        run(scenario)
+
+
+class TestEncode:
+    def test_frames_are_json_text(self):
+        memory = make_memory("mem_1")
+        frame = socket_memory._encode(
+            {
+                "memory": memory,
+                "topics": {"tea"},
+                "at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+            }
+        )
+        assert isinstance(frame, str)
+        decoded = json.loads(frame)
+        assert decoded["memory"] == memory.model_dump(mode="json")
+        assert decoded["topics"] == ["tea"]
+        assert decoded["at"] == "2024-01-01T00:00:00Z"
+
+    def test_unknown_types_are_rejected(self):
+        with pytest.raises(TypeError):
+            socket_memory._encode({"value": object()})
+
+
+class TestChatMessage:
+    def test_memory_is_stored_and_broadcast(self):
+        async def scenario(manager, memory_manager):
+            websocket = await subscribe(manager, "client-1")
+            await manager.handle_message(
+                "client-1",
+                {
+                    "type": "chat",
+                    "conversation_id": "chat-1",
+                    "message": "hello",
+                    "response": "hi",
+                },
+            )
+            await flush()
+
+            frame = websocket.frames[-1]
+            assert frame["type"] == "memory_update"
+            assert frame["memory"]["id"].startswith("mem_")
+            assert frame["memory"]["user_message"] == "hello"
+
+        run(scenario)
+
+
+class TestSearchCacheInvalidation:
+    def test_chat_message_clears_the_search_cache(self):
+        async def scenario(manager, memory_manager):
+            memory_search_cache.insert("ns", [1.0, 0.0], "cached")
+            await manager.connect(FakeWebSocket(), "client-1")
+            await manager.handle_message(
+                "client-1", {"type": "chat", "conversation_id": "chat-1"}
+            )
+            assert memory_search_cache.lookup("ns", [1.0, 0.0], threshold=0.95) is None
+
+        run(scenario)
+
+
+class TestDumpMemories:
+    def test_models_are_dumped_in_one_pass(self):
+        memories = [make_memory("mem_1"), make_memory("mem_2")]
+        assert socket_memory._dump_memories(memories) == [
+            memory.model_dump(mode="json") for memory in memories
+        ]
+
+    def test_raw_rows_pass_through(self):
+        rows = [{"id": "mem_1"}]
+        assert socket_memory._dump_memories(rows) == rows
+        assert socket_memory._dump_memories([]) == []
+
+
+class TestSlowSubscriber:
+    def test_broadcast_drops_only_the_slow_subscriber(self, monkeypatch):
+        async def scenario(manager, memory_manager):
+            fast = await subscribe(manager, "client-1")
+            # Only the slow client gets the tiny queue
+            monkeypatch.setattr(socket_memory, "OUTBOUND_QUEUE_SIZE", 1)
+            slow = StalledWebSocket()
+            await manager.connect(slow, "client-2")
+            await flush()
+            manager.conversation_subscribers["chat-1"].add("client-2")
+
+            for i in range(2):
+                await manager.broadcast_to_conversation("chat-1", {"n": i})
+                await flush()
+
+            assert slow.close_code == 1013
+            assert manager.conversation_subscribers["chat-1"] == {"client-1"}
+            assert fast.frames == [{"n": 0}, {"n": 1}]
+            assert fast.close_code is None
+
+        run(scenario)
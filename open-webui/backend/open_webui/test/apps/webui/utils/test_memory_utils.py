@@ -0,0 +1,155 @@
+import uuid
+
+import pytest
+
+from open_webui.utils import memory
+from open_webui.utils.memory import (
+    SemanticQueryCache,
+    decode_cursor,
+    encode_cursor,
+    new_memory_id,
+    next_page_cursor,
+    page_kwargs,
+    parse_import,
+)
+
+
+class TestCursor:
+    def test_round_trip(self):
+        cursor = encode_cursor("2024-01-02T03:04:05", "mem_1")
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == ("2024-01-02T03:04:05", "mem_1")
+
+    def test_empty_cursor(self):
+        assert decode_cursor(None) is None
+        assert decode_cursor("") is None
+
+    def test_invalid_cursor(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_next_page_cursor(self):
+        rows = [
+            {"created_at": "2024-01-02", "id": "mem_2"},
+            {"created_at": "2024-01-01", "id": "mem_1"},
+        ]
+        assert decode_cursor(next_page_cursor(rows, 2)) == ("2024-01-01", "mem_1")
+        # A short page is the last one
+        assert next_page_cursor(rows, 3) is None
+        assert next_page_cursor([], 3) is None
+
+    def test_page_kwargs(self):
+        assert page_kwargs(None) == {"offset": 0}
+        assert page_kwargs(None, 20) == {"offset": 20}
+        assert page_kwargs(("2024-01-01", "mem_1"), 20) == {
+            "cursor": ("2024-01-01", "mem_1")
+        }
+
+
+class TestSemanticQueryCache:
+    def test_hit_and_miss(self):
+        cache = SemanticQueryCache()
+        cache.insert("ns", [1.0, 0.0], "result")
+        assert cache.lookup("ns", [2.0, 0.01], threshold=0.95) == "result"
+        assert cache.lookup("ns", [0.0, 1.0], threshold=0.95) is None
+
+    def test_namespaces_are_isolated(self):
+        cache = SemanticQueryCache()
+        cache.insert(("user-1", None), [1.0, 0.0], "result")
+        assert cache.lookup(("user-2", None), [1.0, 0.0], threshold=0.95) is None
+
+    def test_dimension_mismatch_is_a_miss(self):
+        cache = SemanticQueryCache()
+        cache.insert("ns", [1.0, 0.0], "result")
+        assert cache.lookup("ns", [1.0, 0.0, 0.0], threshold=0.95) is None
+
+    def test_lru_eviction(self):
+        cache = SemanticQueryCache(max_entries=2)
+        cache.insert("ns", [1.0, 0.0, 0.0], "a")
+        cache.insert("ns", [0.0, 1.0, 0.0], "b")
+        # Touch "a" so "b" is the least recently used entry
+        assert cache.lookup("ns", [1.0, 0.0, 0.0], threshold=0.95) == "a"
+        cache.insert("ns", [0.0, 0.0, 1.0], "c")
+        assert cache.lookup("ns", [0.0, 1.0, 0.0], threshold=0.95) is None
+        assert cache.lookup("ns", [1.0, 0.0, 0.0], threshold=0.95) == "a"
+        assert cache.lookup("ns", [0.0, 0.0, 1.0], threshold=0.95) == "c"
+
+    def test_ttl(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(memory.time, "monotonic", lambda: now[0])
+        cache = SemanticQueryCache(ttl=10)
+        cache.insert("ns", [1.0, 0.0], "result")
+        now[0] += 5
+        assert cache.lookup("ns", [1.0, 0.0], threshold=0.95) == "result"
+        now[0] += 10
+        assert cache.lookup("ns", [1.0, 0.0], threshold=0.95) is None
+        # Expired namespaces do not linger
+        assert cache._namespaces == {}
+
+
+class TestParseImport:
+    def test_json_rows(self):
+        rows = [{"id": "mem_1"}, {"id": "mem_2"}]
+        assert parse_import({"data": rows}, "json") == rows
+
+    def test_json_text(self):
+        assert parse_import({"data": '[{"id": "mem_1"}]'}, "json") == [{"id": "mem_1"}]
+        ndjson = '{"id": "mem_1"}\n\n{"id": "mem_2"}\n'
+        assert parse_import({"data": ndjson}, "json") == [
+            {"id": "mem_1"},
+            {"id": "mem_2"},
+        ]
+
+    def test_csv(self):
+        data = 'id,context\nmem_1,"{""a"": 1}"\n'
+        assert parse_import({"data": data}, "csv") == [
+            {"id": "mem_1", "context": {"a": 1}}
+        ]
+
+    @pytest.mark.parametrize(
+        "data, fmt",
+        [
+            ({"memories": [{"id": "mem_1"}]}, "json"),
+            ({"data": {"id": "mem_1"}}, "json"),
+            ({"data": ["mem_1"]}, "json"),
+            ({"data": "{not json"}, "json"),
+            ({"data": [{"id": "mem_1"}]}, "csv"),
+            ({"data": "id,context\nmem_1\n"}, "csv"),
+            ({"data": "id\nmem_1,extra\n"}, "csv"),
+            ({"data": "id\n" + "x" * 200_000 + "\n"}, "csv"),
+        ],
+    )
+    def test_rejects_malformed_payloads(self, data, fmt):
+        with pytest.raises(ValueError):
+            parse_import(data, fmt)
+
+
+class TestNewMemoryId:
+    def test_format(self):
+        memory_id = new_memory_id()
+        assert memory_id.startswith("mem_")
+        value = uuid.UUID(hex=memory_id[len("mem_") :])
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+
+    def test_time_ordered(self, monkeypatch):
+        monkeypatch.setattr(memory.time, "time_ns", lambda: 1_700_000_000_000_000_000)
+        earlier = new_memory_id()
+        monkeypatch.setattr(memory.time, "time_ns", lambda: 1_700_000_000_001_000_000)
+        later = new_memory_id()
+        assert earlier < later
+
+    def test_unique_within_a_millisecond(self, monkeypatch):
+        monkeypatch.setattr(memory.time, "time_ns", lambda: 1_700_000_000_000_000_000)
+        assert len({new_memory_id() for _ in range(1000)}) == 1000
+
+
+class TestSemanticQueryCacheGeneration:
+    def test_clear_drops_in_flight_inserts(self):
+        cache = SemanticQueryCache()
+        generation = cache.generation
+        cache.clear()
+        cache.insert("ns", [1.0, 0.0], "stale", generation)
+        assert cache.lookup("ns", [1.0, 0.0], threshold=0.95) is None
+        cache.insert("ns", [1.0, 0.0], "fresh", cache.generation)
+        assert cache.lookup("ns", [1.0, 0.0], threshold=0.95) == "fresh"
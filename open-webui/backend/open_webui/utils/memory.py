@@ -0,0 +1,242 @@
+import base64
+import csv
+import io
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+import orjson
+
+from open_webui.env import MEMORY_SEARCH_CACHE_SIZE, MEMORY_SEARCH_CACHE_TTL
+
+
+def new_memory_id() -> str:
+    """
+    Generate a time-ordered memory ID (UUIDv7 layout, RFC 9562).
+    48 bits of unix milliseconds, 12 bits of sub-millisecond precision and
+    62 random bits, so IDs sort by creation time and never collide in practice.
+    """
+    ns = time.time_ns()
+    ms, sub_ms = divmod(ns, 1_000_000)
+    value = (ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= (sub_ms * 4096 // 1_000_000) << 64
+    value |= 0b10 << 62
+    value |= int.from_bytes(os.urandom(8), "big") & 0x3FFFFFFFFFFFFFFF
+    return f"mem_{uuid.UUID(int=value).hex}"
+
+
+def encode_cursor(created_at: Any, memory_id: str) -> str:
+    """Encode the last seen (created_at, id) pair as an opaque page cursor"""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    payload = json.dumps({"ts": created_at, "id": memory_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Decode a page cursor back into its (created_at, id) pair"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return payload["ts"], payload["id"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def page_kwargs(cursor: Optional[Tuple[str, str]], offset: int = 0) -> Dict[str, Any]:
+    """
+    Pagination arguments for MemoryManager: the decoded cursor when the client
+    sent one, otherwise the plain offset, so offset callers make the old call
+    """
+    if cursor is not None:
+        return {"cursor": cursor}
+    return {"offset": offset}
+
+
+def next_page_cursor(memories: Sequence[Any], limit: int) -> Optional[str]:
+    """Build the cursor for the page after `memories`, or None on the last page"""
+    if not memories or len(memories) < limit:
+        return None
+    last = memories[-1]
+    if isinstance(last, dict):
+        return encode_cursor(last["created_at"], last["id"])
+    return encode_cursor(last.created_at, last.id)
+
+
+def _parse_csv_value(value: str) -> Any:
+    if value[:1] in ("{", "["):
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            pass
+    return value
+
+
+def parse_import(data: Dict[str, Any], fmt: str) -> List[Dict[str, Any]]:
+    """
+    Turn an import payload into plain memory rows.
+    Expects rows under "data": CSV text for "csv"; a list of rows, a JSON
+    array or NDJSON text for "json". Raises ValueError on anything else.
+    """
+    if not isinstance(data, dict) or "data" not in data:
+        raise ValueError('Import payload must have a "data" field')
+    payload = data["data"]
+
+    if fmt == "csv":
+        if not isinstance(payload, str):
+            raise ValueError('CSV import "data" must be a string')
+        rows = []
+        try:
+            for row in csv.DictReader(io.StringIO(payload)):
+                if None in row or None in row.values():
+                    raise ValueError(
+                        f"CSV row {len(rows) + 1} does not match the header"
+                    )
+                rows.append(
+                    {key: _parse_csv_value(value) for key, value in row.items()}
+                )
+        except csv.Error as e:
+            raise ValueError(f"Invalid CSV: {e}")
+        return rows
+
+    if isinstance(payload, str):
+        if payload.lstrip().startswith("["):
+            payload = orjson.loads(payload)
+        else:
+            payload = [
+                orjson.loads(line) for line in payload.splitlines() if line.strip()
+            ]
+    if not isinstance(payload, list):
+        raise ValueError('JSON import "data" must be a list or JSON text')
+    if not all(isinstance(row, dict) for row in payload):
+        raise ValueError("Every imported memory must be a JSON object")
+    return payload
+
+
+class SemanticQueryCache:
+    """
+    Bounded TTL + LRU cache of search results keyed by query embedding.
+
+    A lookup hits when a cached query in the same namespace has cosine
+    similarity >= threshold with the incoming one. Namespaces keep filtered
+    searches (memory type, relevance floor, user) from answering each other.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[Hashable, np.ndarray, Any, float]]" = (
+            OrderedDict()
+        )
+        self._namespaces: Dict[Hashable, List[int]] = {}
+        self._next_id = 0
+        # Bumped on every clear; see insert()
+        self.generation = 0
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(
+        self, namespace: Hashable, embedding: Sequence[float], threshold: float
+    ) -> Optional[Any]:
+        """Return the cached result for the closest query, or None on a miss"""
+        entry_ids = self._namespaces.get(namespace)
+        if not entry_ids:
+            return None
+
+        now = time.monotonic()
+        live_ids = []
+        for entry_id in entry_ids:
+            entry = self._entries.get(entry_id)
+            if entry is not None and now - entry[3] <= self.ttl:
+                live_ids.append(entry_id)
+            elif entry is not None:
+                del self._entries[entry_id]
+        if not live_ids:
+            del self._namespaces[namespace]
+            return None
+        self._namespaces[namespace] = live_ids
+
+        query = self._normalize(embedding)
+        matrix = np.stack([self._entries[entry_id][1] for entry_id in live_ids])
+        if matrix.shape[1:] != query.shape:
+            # Embedded by a different model; it can never match
+            return None
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+
+        entry_id = live_ids[best]
+        self._entries.move_to_end(entry_id)
+        return self._entries[entry_id][2]
+
+    def insert(
+        self,
+        namespace: Hashable,
+        embedding: Sequence[float],
+        result: Any,
+        generation: Optional[int] = None,
+    ):
+        """
+        Cache `result` for the query embedding, evicting the oldest entry if full.
+        Pass the `generation` read before the search ran; if the cache was
+        cleared since, the result may be stale and is not stored.
+        """
+        if generation is not None and generation != self.generation:
+            return
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (
+            namespace,
+            self._normalize(embedding),
+            result,
+            time.monotonic(),
+        )
+        self._namespaces.setdefault(namespace, []).append(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            evicted_id, (evicted_ns, _, _, _) = self._entries.popitem(last=False)
+            remaining = self._namespaces.get(evicted_ns)
+            if remaining is not None:
+                remaining.remove(evicted_id)
+                if not remaining:
+                    del self._namespaces[evicted_ns]
+
+    def clear(self):
+        """Drop every cached result, e.g. after memories are written"""
+        self.generation += 1
+        self._entries.clear()
+        self._namespaces.clear()
+
+
+# Shared by the REST router and the websocket manager, so a write through
+# either path invalidates searches served by the other
+memory_search_cache = SemanticQueryCache(
+    max_entries=MEMORY_SEARCH_CACHE_SIZE, ttl=MEMORY_SEARCH_CACHE_TTL
+)
+
+
+def invalidate_memory_search_cache():
+    """Drop cached memory search results; call after every memory write"""
+    memory_search_cache.clear()
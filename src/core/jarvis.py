@@ -1,15 +1,40 @@
 import os
+import re
+import asyncio
+import time
 import uuid
-from typing import Optional, Dict, Any
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 import aiohttp
+import orjson
 from datetime import datetime
 
+# Opt-in: identical chat requests within the TTL are answered without calling
+# Ollama. Replies are sampled, so caching is off (TTL 0) unless configured.
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "0"))
+
+# Fixed prompt section headers and the context keys that have their own section
+MEMORY_HEADER = "Previous conversation context:"
+KNOWLEDGE_HEADER = "Relevant knowledge:"
+SECTIONED_CONTEXT_KEYS = frozenset(("memory", "knowledge"))
+
+# Greetings and acknowledgements (English and Dutch) that never need knowledge lookup
+TRIVIAL_MESSAGE_RE = re.compile(
+    r"^(hi|hello|hey|thanks|thank you|thx|ok|okay|yes|no|bye|"
+    r"hoi|hallo|dank je|dankjewel|bedankt|ja|nee|doei)[\s.!?]*$",
+    re.IGNORECASE
+)
+
 class JarvisAI:
     def __init__(self, knowledge_manager, memory_manager, language_detector):
         self.knowledge_manager = knowledge_manager
         self.memory_manager = memory_manager
         self.language_detector = language_detector
         self.ollama_api_url = os.getenv("OLLAMA_API_URL", "http://localhost:11434")
+        self._response_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._session: Optional[aiohttp.ClientSession] = None
         
         # Load system prompt
         self.system_prompt = self._load_system_prompt()
@@ -35,9 +60,16 @@ class JarvisAI:
         # Detect language
         language = self.language_detector.detect(message)
 
-        # Get relevant context from memory and knowledge base
-        memory_context = await self.memory_manager.get_context(conversation_id)
-        knowledge_context = await self.knowledge_manager.search_relevant_info(message)
+        # Get relevant context from memory and knowledge base concurrently,
+        # skipping the knowledge search for greetings and acknowledgements
+        if TRIVIAL_MESSAGE_RE.match(message.strip()):
+            memory_context = await self.memory_manager.get_context(conversation_id)
+            knowledge_context = {}
+        else:
+            memory_context, knowledge_context = await asyncio.gather(
+                self.memory_manager.get_context(conversation_id),
+                self.knowledge_manager.search_relevant_info(message)
+            )
 
         # Combine all context
         full_context = {
@@ -50,19 +82,14 @@ class JarvisAI:
         prompt = self._prepare_prompt(message, full_context, language)
 
         # Get response from Ollama
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.ollama_api_url}/api/chat",
-                json={
-                    "model": "jarvis",
-                    "messages": [
-                        {"role": "system", "content": self.system_prompt},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "stream": False
-                }
-            ) as response:
-                result = await response.json()
+        result = await self._chat({
+            "model": "jarvis",
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "stream": False
+        })
 
         # Extract the response
         ai_response = result["message"]["content"]
@@ -83,18 +110,59 @@ class JarvisAI:
             "conversation_id": conversation_id
         }
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=300)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _chat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Call Ollama's chat endpoint, reusing the reply for an identical request"""
+        # The canonical bytes are both the cache key source and the request body
+        body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        key = hashlib.sha256(body).hexdigest()
+
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            stored_at, result = cached
+            if time.monotonic() - stored_at <= RESPONSE_CACHE_TTL:
+                self._response_cache.move_to_end(key)
+                return result
+            del self._response_cache[key]
+
+        async with self._get_session().post(
+            f"{self.ollama_api_url}/api/chat",
+            data=body,
+            headers={"Content-Type": "application/json"}
+        ) as response:
+            result = orjson.loads(await response.read())
+
+        if response.status == 200 and RESPONSE_CACHE_TTL > 0:
+            self._response_cache[key] = (time.monotonic(), result)
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+        return result
+
     def _prepare_prompt(self, message: str, context: Dict[str, Any], language: str) -> str:
         """Prepare the prompt with context for the AI"""
         prompt_parts = []
 
         # Add memory context if available
         if context.get("memory"):
-            prompt_parts.append("Previous conversation context:")
+            prompt_parts.append(MEMORY_HEADER)
             prompt_parts.append(context["memory"])
 
         # Add knowledge context if available
         if context.get("knowledge"):
-            prompt_parts.append("Relevant knowledge:")
+            prompt_parts.append(KNOWLEDGE_HEADER)
             prompt_parts.append(context["knowledge"])
 
         # Add the user's message
@@ -103,7 +171,7 @@ class JarvisAI:
 
         # Add any additional context
         for key, value in context.items():
-            if key not in ["memory", "knowledge"]:
+            if key not in SECTIONED_CONTEXT_KEYS:
                 prompt_parts.append(f"{key}:")
                 prompt_parts.append(str(value))
 
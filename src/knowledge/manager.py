@@ -2,14 +2,18 @@ import os
 import io
 import json
 import hashlib
+import functools
 import aiohttp
 import asyncio
 import aiofiles
 import warnings
 import logging
+import threading
 import time
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Union, BinaryIO
 from datetime import datetime
+import numpy as np
 import chromadb
 from chromadb.config import Settings
 from chromadb.api.types import EmbeddingFunction, Documents, Embeddings
@@ -30,26 +34,62 @@ warnings.filterwarnings("ignore", category=FutureWarning,
                        message=".*resume_download is deprecated.*")
 
 class CustomSentenceTransformerEmbedding(EmbeddingFunction):
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', cache_size: int = 4096):
         from sentence_transformers import SentenceTransformer
         # Disable transformers warnings during model loading
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
             self.model = SentenceTransformer(model_name)
             self.batch_size = 32  # Configurable batch size for memory efficiency
+        
+        # LRU of recent embeddings so repeated queries skip the model
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()  # queries run in worker threads
+
+    def _cache_key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\0{text}".encode()).hexdigest()
 
     def __call__(self, input: Documents) -> Embeddings:
         if not input:
             return []
         
-        # Process in batches
-        all_embeddings = []
-        for i in range(0, len(input), self.batch_size):
-            batch = input[i:i + self.batch_size]
-            embeddings = self.model.encode(batch, convert_to_tensor=True)
-            all_embeddings.extend(embeddings.tolist())
+        keys = [self._cache_key(text) for text in input]
+        found: Dict[int, np.ndarray] = {}
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                embedding = self._cache.get(key)
+                if embedding is not None:
+                    self._cache.move_to_end(key)
+                    found[i] = embedding
+        misses = [i for i in range(len(keys)) if i not in found]
+        
+        # Only embed texts that are not cached, in batches
+        for start in range(0, len(misses), self.batch_size):
+            batch = misses[start:start + self.batch_size]
+            embeddings = self.model.encode(
+                [input[i] for i in batch],
+                batch_size=self.batch_size,
+                convert_to_numpy=True
+            ).astype(np.float32, copy=False)
+            # Copy each row so a cached entry does not pin its whole batch
+            found.update((i, row.copy()) for i, row in zip(batch, embeddings))
+        
+        with self._cache_lock:
+            for i in misses:
+                self._cache[keys[i]] = found[i]
+            
+            # Evict least recently used entries past the bound
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
         
-        return all_embeddings
+        return [found[i].tolist() for i in range(len(keys))]
+
+@functools.lru_cache(maxsize=4)
+def get_embedding_function(model_name: str = 'all-MiniLM-L6-v2') -> CustomSentenceTransformerEmbedding:
+    """Load an embedding model once per process and share it between users"""
+    return CustomSentenceTransformerEmbedding(model_name)
 
 class DocumentProcessor:
     """Handles different document types and extracts text content"""
@@ -143,7 +183,13 @@ class DocumentProcessor:
                 raise ValueError(f"Unsupported file type: {file_type}")
 
 class KnowledgeManager:
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        search_cache_size: int = 1024,
+        search_cache_ttl: float = 300
+    ):
         # Set up configuration
         self.chromadb_host = os.getenv("CHROMADB_HOST", "localhost")
         self.chromadb_port = int(os.getenv("CHROMADB_PORT", "8000"))
@@ -164,6 +210,17 @@ class KnowledgeManager:
             "total_tokens": 0
         }
         
+        # Recent search results, keyed by (limit, min_relevance_score, query hash)
+        self.search_cache_size = search_cache_size
+        self.search_cache_ttl = search_cache_ttl
+        self._search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        # Bumped on every clear so searches in flight cannot re-insert stale results
+        self._search_generation = 0
+        
+        # Last health probe result, reused by rapid health-check polls
+        self.health_check_ttl = 5
+        self._last_health: Optional[tuple] = None
+        
         # Initialize ChromaDB
         self._init_chromadb()
 
@@ -190,7 +247,7 @@ class KnowledgeManager:
 
                 # Set up embedding function with error handling
                 try:
-                    self.embedding_function = CustomSentenceTransformerEmbedding()
+                    self.embedding_function = get_embedding_function()
                 except Exception as e:
                     logger.error(f"Failed to initialize embedding function: {str(e)}")
                     raise
@@ -270,6 +327,9 @@ class KnowledgeManager:
             self.metrics["total_chunks"] += len(chunks)
             self.metrics["total_tokens"] += sum(len(chunk.split()) for chunk in chunks)
             
+            # New chunks can change any cached search result
+            self.clear_search_cache()
+            
             processing_time = time.time() - start_time
             
             # Return detailed result
@@ -302,10 +362,23 @@ class KnowledgeManager:
         """
         Search for relevant information in the knowledge base.
         Returns a dictionary with relevant text, sources, and relevance scores.
+        Repeated searches within search_cache_ttl are served from memory.
         """
+        cache_key = self._search_cache_key(query, limit, min_relevance_score)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            cached_at, result = cached
+            if time.monotonic() - cached_at <= self.search_cache_ttl:
+                self._search_cache.move_to_end(cache_key)
+                return result
+            del self._search_cache[cache_key]
+        generation = self._search_generation
+        
         try:
             # Query ChromaDB for relevant chunks with metadata
-            results = self.collection.query(
+            # Blocking HTTP + local embedding, so keep it off the event loop
+            results = await asyncio.to_thread(
+                self.collection.query,
                 query_texts=[query],
                 n_results=limit,
                 include_metadata=True,
@@ -321,46 +394,46 @@ class KnowledgeManager:
             }
             
             if results and results['documents']:
-                # Convert distances to similarity scores (1 - normalized_distance)
-                max_distance = max(results['distances'][0]) if results['distances'][0] else 1
-                similarities = [1 - (d / max_distance) for d in results['distances'][0]]
+                documents = results["documents"][0]
+                metadatas = results["metadatas"][0]
                 
-                # Filter and sort by relevance
-                filtered_results = []
-                for doc, metadata, similarity in zip(
-                    results["documents"][0],
-                    results["metadatas"][0],
-                    similarities
-                ):
-                    if similarity >= min_relevance_score:
-                        filtered_results.append({
-                            "text": doc,
-                            "metadata": metadata,
-                            "relevance": similarity
-                        })
+                # Convert distances to similarity scores (1 - normalized_distance)
+                distances = np.asarray(results['distances'][0], dtype=np.float64)
+                max_distance = distances.max() if distances.size and distances.max() > 0 else 1
+                similarities = 1 - distances / max_distance
                 
-                # Sort by relevance
-                filtered_results.sort(key=lambda x: x["relevance"], reverse=True)
+                # Filter and sort by relevance as index arrays, no per-row dicts
+                keep = np.flatnonzero(similarities >= min_relevance_score)
+                order = keep[np.argsort(-similarities[keep], kind="stable")]
                 
                 # Combine results
-                for result in filtered_results:
-                    combined_info["text"].append(result["text"])
-                    if result["metadata"].get("source"):
-                        combined_info["sources"].add(result["metadata"]["source"])
-                    combined_info["relevance_scores"].append(result["relevance"])
+                for i in order:
+                    text, metadata, relevance = documents[i], metadatas[i], float(similarities[i])
+                    combined_info["text"].append(text)
+                    if metadata.get("source"):
+                        combined_info["sources"].add(metadata["source"])
+                    combined_info["relevance_scores"].append(relevance)
                     combined_info["chunks"].append({
-                        "text": result["text"],
-                        "metadata": result["metadata"],
-                        "relevance": result["relevance"]
+                        "text": text,
+                        "metadata": metadata,
+                        "relevance": relevance
                     })
             
-            return {
+            result = {
                 "text": "\n".join(combined_info["text"]),
                 "sources": list(combined_info["sources"]),
                 "relevance_scores": combined_info["relevance_scores"],
                 "chunks": combined_info["chunks"],
                 "query_timestamp": datetime.utcnow().isoformat()
             }
+            
+            # Skip the insert if the knowledge base changed while we queried
+            if generation == self._search_generation:
+                self._search_cache[cache_key] = (time.monotonic(), result)
+                if len(self._search_cache) > self.search_cache_size:
+                    self._search_cache.popitem(last=False)
+            
+            return result
         except Exception as e:
             logger.error(f"Error searching knowledge base: {str(e)}", exc_info=True)
             raise HTTPException(
@@ -372,11 +445,25 @@ class KnowledgeManager:
                 }
             )
 
+    def _search_cache_key(self, query: str, limit: int, min_relevance_score: float) -> tuple:
+        """
+        Key a search by its normalized query. The embedding model is uncased and
+        ignores whitespace runs, so case and spacing variants share one entry.
+        """
+        normalized = " ".join(query.split()).lower()
+        digest = hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+        return (limit, min_relevance_score, digest)
+
+    def clear_search_cache(self) -> None:
+        """Drop all cached search results, e.g. after the knowledge base changes"""
+        self._search_generation += 1
+        self._search_cache.clear()
+
     def _generate_doc_id(self, content: str) -> str:
         """Generate a unique document ID based on content hash"""
-        content_hash = hashlib.sha256(content.encode()).hexdigest()
+        content_hash = hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        return f"doc_{timestamp}_{content_hash[:16]}"
+        return f"doc_{timestamp}_{content_hash}"
 
     async def _chunk_text(self, text: str) -> List[str]:
         """Split text into smaller chunks with improved chunking strategy"""
@@ -447,8 +534,38 @@ class KnowledgeManager:
             logger.error(f"Error chunking text: {str(e)}", exc_info=True)
             raise
 
+    async def warmup(self) -> None:
+        """
+        Run one throwaway query so the embedding model's first forward pass and
+        ChromaDB's index load happen before real traffic arrives
+        """
+        try:
+            start_time = time.time()
+            await asyncio.to_thread(
+                self.collection.query,
+                query_texts=["warmup"],
+                n_results=1
+            )
+            logger.info(f"Knowledge base warmed up in {time.time() - start_time:.2f} seconds")
+        except Exception as e:
+            logger.warning(f"Knowledge base warmup failed: {str(e)}")
+
     async def health_check(self) -> bool:
-        """Check if the knowledge base is healthy"""
+        """
+        Check if the knowledge base is healthy.
+        The write/query/delete probe runs at most once per health_check_ttl seconds.
+        """
+        if self._last_health is not None:
+            checked_at, healthy = self._last_health
+            if time.monotonic() - checked_at <= self.health_check_ttl:
+                return healthy
+        
+        healthy = await self._probe_health()
+        self._last_health = (time.monotonic(), healthy)
+        return healthy
+
+    async def _probe_health(self) -> bool:
+        """Add, query and delete a test document"""
         try:
             # Test basic operations
             test_id = f"health_check_{datetime.utcnow().isoformat()}"
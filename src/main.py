@@ -3,12 +3,14 @@ from fastapi import FastAPI, HTTPException, Depends
 from fastapi.security import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from pydantic import BaseModel, Field, validator
 from typing import Optional, Dict, Any
 import uvicorn
+import asyncio
 import os
 import logging
 import time
@@ -22,7 +24,7 @@ from memory.manager import MemoryManager
 
 # Set up logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(),
@@ -41,6 +43,7 @@ api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 jarvis = None
 knowledge_manager = None
 websocket_server = None
+warmup_task = None
 
 async def verify_api_key(api_key: str = Depends(api_key_header)):
     """Verify API key if enabled"""
@@ -64,7 +67,7 @@ async def get_memory_manager() -> MemoryManager:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Initialize components
-    global jarvis, knowledge_manager, websocket_server
+    global jarvis, knowledge_manager, websocket_server, warmup_task
     
     try:
         # Create required directories
@@ -94,6 +97,9 @@ async def lifespan(app: FastAPI):
             knowledge_manager=knowledge_manager
         )
         
+        # Warm the knowledge base in the background so startup isn't delayed
+        warmup_task = asyncio.create_task(knowledge_manager.warmup())
+        
         logger.info("All components initialized successfully")
         yield
     except Exception as e:
@@ -106,6 +112,11 @@ async def lifespan(app: FastAPI):
                 await memory_manager.cleanup_old_conversations()
             if websocket_server:
                 await websocket_server.cleanup_background_tasks()
+            if jarvis:
+                await jarvis.close()
+            if warmup_task and not warmup_task.done():
+                warmup_task.cancel()
+                await asyncio.gather(warmup_task, return_exceptions=True)
         except Exception as e:
             logger.error(f"Error during cleanup: {str(e)}")
         logger.info("Shutting down")
@@ -114,7 +125,8 @@ app = FastAPI(
     title="Jarvis AI Backend",
     description="Advanced bilingual AI assistant API",
     version="3.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -207,7 +219,7 @@ async def chat(
         
         # Log processing time
         processing_time = time.time() - start_time
-        logger.info(f"Message processed in {processing_time:.2f} seconds")
+        logger.info("Message processed in %.2f seconds", processing_time)
         
         return {
             **response,
@@ -251,7 +263,7 @@ async def upload_knowledge(
         
         # Log processing time
         processing_time = time.time() - start_time
-        logger.info(f"Document processed in {processing_time:.2f} seconds")
+        logger.info("Document processed in %.2f seconds", processing_time)
         
         return {
             "status": "success",
@@ -293,6 +305,22 @@ async def delete_conversation(
             }
         )
 
+@app.post("/cache/clear")
+async def clear_cache(api_key: str = Depends(verify_api_key)):
+    """Clear cached knowledge search results"""
+    if not knowledge_manager:
+        raise HTTPException(
+            status_code=503,
+            detail="Knowledge manager is initializing, please try again in a moment"
+        )
+    
+    knowledge_manager.clear_search_cache()
+    return {
+        "status": "success",
+        "message": "Search cache cleared",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 @app.get("/metrics/websocket")
 async def websocket_metrics(api_key: str = Depends(verify_api_key)):
     """Get WebSocket connection metrics"""
@@ -9,6 +9,7 @@ from pathlib import Path
 import aiofiles
 import gzip
 import shutil
+from collections import Counter
 from fastapi.encoders import jsonable_encoder
 
 logger = logging.getLogger(__name__)
@@ -41,6 +42,9 @@ class MemoryManager:
         # Initialize memory graph
         self.memory_graph = nx.DiGraph()
         
+        # PageRank of the graph, recomputed only after the graph changes
+        self._pagerank: Optional[Dict[str, float]] = None
+        
         # Background task
         self.cleanup_task = None
         
@@ -106,7 +110,7 @@ class MemoryManager:
             # Update memory graph
             await self._update_memory_graph(memory_entry)
             
-            logger.debug(f"Successfully stored interaction for conversation {conversation_id}")
+            logger.debug("Successfully stored interaction for conversation %s", conversation_id)
         except Exception as e:
             logger.error(f"Error storing interaction: {str(e)}", exc_info=True)
             raise
@@ -140,7 +144,7 @@ class MemoryManager:
             # Get related memories from the graph
             if conversation_id in self.memory_graph:
                 # Get most relevant related conversations using PageRank
-                pagerank = nx.pagerank(self.memory_graph)
+                pagerank = self._get_pagerank()
                 related_nodes = sorted(
                     [(node, pagerank[node]) for node in nx.neighbors(self.memory_graph, conversation_id)],
                     key=lambda x: x[1],
@@ -189,10 +193,18 @@ class MemoryManager:
             logger.error(f"Error loading memories: {str(e)}", exc_info=True)
             raise
 
+    def _get_pagerank(self) -> Dict[str, float]:
+        """Get PageRank scores for the memory graph, reusing them until it changes"""
+        if self._pagerank is None:
+            self._pagerank = nx.pagerank(self.memory_graph)
+        return self._pagerank
+
     async def _update_memory_graph(self, memory_entry: Dict[str, Any]) -> None:
         """Update the memory graph with new information"""
         try:
             conversation_id = memory_entry["conversation_id"]
+            # PageRank only depends on nodes, edges and weights
+            structure_changed = False
             
             # Add node if it doesn't exist
             if conversation_id not in self.memory_graph:
@@ -200,6 +212,7 @@ class MemoryManager:
                     conversation_id,
                     timestamp=memory_entry["timestamp"]
                 )
+                structure_changed = True
 
             # Extract key topics or entities from the interaction
             topics = await self._extract_topics(memory_entry)
@@ -212,6 +225,9 @@ class MemoryManager:
                     if common_topics:
                         # Calculate similarity score based on common topics
                         similarity = len(common_topics) / len(topics.union(existing_topics))
+                        edge = self.memory_graph.get_edge_data(conversation_id, existing_node)
+                        if edge is None or edge.get("weight") != similarity:
+                            structure_changed = True
                         self.memory_graph.add_edge(
                             conversation_id,
                             existing_node,
@@ -221,6 +237,8 @@ class MemoryManager:
             # Update node attributes
             self.memory_graph.nodes[conversation_id]["topics"] = topics
             self.memory_graph.nodes[conversation_id]["last_updated"] = memory_entry["timestamp"]
+            if structure_changed:
+                self._pagerank = None
         except Exception as e:
             logger.error(f"Error updating memory graph: {str(e)}", exc_info=True)
             raise
@@ -281,6 +299,7 @@ class MemoryManager:
             # Remove from graph
             if conversation_id in self.memory_graph:
                 self.memory_graph.remove_node(conversation_id)
+                self._pagerank = None
             
             logger.info(f"Successfully removed conversation {conversation_id}")
         except Exception as e:
@@ -584,7 +603,7 @@ class MemoryManager:
             patterns = {
                 "total_conversations": len(self.memory_graph.nodes),
                 "active_users": set(),
-                "popular_topics": {},
+                "popular_topics": Counter(),
                 "avg_conversation_length": 0,
                 "peak_usage_times": {}
             }
@@ -611,8 +630,9 @@ class MemoryManager:
                         conversations_analyzed += 1
                         
                         # Analyze topics
-                        for topic in self.memory_graph.nodes[node].get("topics", set()):
-                            patterns["popular_topics"][topic] = patterns["popular_topics"].get(topic, 0) + 1
+                        patterns["popular_topics"].update(
+                            self.memory_graph.nodes[node].get("topics", set())
+                        )
                         
                 except Exception as e:
                     logger.error(f"Error analyzing conversation {node}: {str(e)}")
@@ -622,13 +642,7 @@ class MemoryManager:
                 patterns["avg_conversation_length"] = total_messages / conversations_analyzed
             
             # Sort and limit popular topics
-            patterns["popular_topics"] = dict(
-                sorted(
-                    patterns["popular_topics"].items(),
-                    key=lambda x: x[1],
-                    reverse=True
-                )[:10]
-            )
+            patterns["popular_topics"] = dict(patterns["popular_topics"].most_common(10))
             
             return patterns
             